@@ -1,23 +1,33 @@
 from docx import Document
+import pypdfium2
 import streamlit as st
+import io
 import re
+import heapq
 from collections import Counter
-import nltk
-# We will import stopwords and word_tokenize *after* ensuring resources are ready
-nltk.download('punkt_tab')  # Ensure punkt is downloaded for tokenization
+
+_PUNCT_RE = re.compile(r'[^\w\s]')  # Strips punctuation during preprocessing
+# Same deletions as _PUNCT_RE for ASCII text, applied with str.translate
+_PUNCT_TABLE = str.maketrans('', '', ''.join(c for c in map(chr, range(128)) if _PUNCT_RE.match(c)))
+_DIGITS = frozenset("0123456789")  # Single-character ASCII tokens kept by preprocessing
 
 # --- NLTK Resource Download (Console Output) ---
 
+@st.cache_resource(show_spinner=False)
 def download_nltk_resources():
     """
     Downloads NLTK resources if they are not already present.
-    Uses st.cache_resource to run only once per session.
+    Uses st.cache_resource to run only once per process; the Analyze handler
+    clears the cache on failure so the download is retried on the next click.
     Prints status to the console.
-    Returns True if all essential resources are confirmed available, False otherwise.
+    Returns a tuple of (ready, stop_words), where ready is True
+    if all essential resources are confirmed available, False otherwise.
+    NLTK is imported here rather than at module top so the UI renders first.
     """
+    import nltk
+
     resources_to_check = {
-        "stopwords": "corpora/stopwords.zip",
-        "punkt": "tokenizers/punkt"
+        "stopwords": "corpora/stopwords.zip"
     }
     all_resources_ready = True
 
@@ -58,86 +68,83 @@ def download_nltk_resources():
         # st.success("NLTK resources loaded successfully.")
         
     print("--- End NLTK Resource Check ---\n")
-    return all_resources_ready
 
-# --- Initialize NLTK resources and dependent imports ---
-# This function will now print to console
-NLTK_RESOURCES_READY = download_nltk_resources()
+    if not all_resources_ready:
+        return False, frozenset()
 
-if NLTK_RESOURCES_READY:
     from nltk.corpus import stopwords
-    from nltk.tokenize import word_tokenize
-    STOP_WORDS = set(stopwords.words('english'))
-    print("[APP INFO] NLTK stopwords and word_tokenize loaded.")
-else:
-    st.error("Application cannot proceed effectively without NLTK resources. Please resolve the download issues (see console).")
-    STOP_WORDS = set()
-    def word_tokenize(text):
-        print("[APP WARNING] word_tokenize is using a fallback due to missing NLTK resources.")
-        st.warning("word_tokenize is not fully available due to missing NLTK resources.")
-        return text.split() if text else []
-    # Consider st.stop() if the app is truly unusable
+    print("[APP INFO] NLTK stopwords loaded.")
+    return True, frozenset(stopwords.words('english'))
 
 # (The rest of your helper functions and Streamlit app code remains the same)
 # ... (extract_text_from_pdf, extract_text_from_docx, preprocess_text, etc.)
 # ... (Streamlit UI layout: title, columns, inputs, button, results)
 
-# Make sure your `preprocess_text` function still checks `NLTK_RESOURCES_READY`
-# or handles potential errors if `word_tokenize` is the dummy version.
+# Make sure your `preprocess_text` function still checks `NLTK_RESOURCES_READY`.
+# NLTK_RESOURCES_READY and STOP_WORDS are set by the Analyze handler.
 
 # Example of how preprocess_text might look:
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
 def preprocess_text(text):
+    """Tokenizes and filters text. Cached on the text across reruns; returns a tuple."""
     if not text:
-        return []
+        return ()
     if not NLTK_RESOURCES_READY:
-        print("[PREPROCESS WARNING] NLTK resources not ready, preprocessing quality will be affected.")
-        # Fallback to basic processing if NLTK is not available
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', '', text)
-        tokens = text.split()
-        # STOP_WORDS might be an empty set if NLTK failed, which is fine
-        filtered_tokens = [word for word in tokens if word not in STOP_WORDS and (len(word) > 1 or word.isdigit())]
-        return filtered_tokens
-
-    # Normal processing if NLTK is ready
-    text = text.lower()
-    text = re.sub(r'[^\w\s]', '', text)
-    try:
-        tokens = word_tokenize(text)
-    except Exception as e:
-        print(f"[PREPROCESS ERROR] Error during word tokenization: {e}. Using basic split.")
-        st.error(f"Error during word tokenization (likely NLTK punkt issue): {e}. Using fallback.")
-        tokens = text.split()
-
-    filtered_tokens = [
-        word for word in tokens
-        if word not in STOP_WORDS and (len(word) > 1 or word.isdigit())
-    ]
-    return filtered_tokens
+        print("[PREPROCESS WARNING] NLTK resources not ready, stopwords will not be removed.")
 
-def extract_text_from_pdf(file):
-    reader = PyPDF2.PdfReader(file)
-    return " ".join([page.extract_text() or "" for page in reader.pages])
+    # Use the translate table for ASCII text and fall back to the regex for Unicode
+    is_ascii = text.isascii()
+    if is_ascii:
+        text = text.lower().translate(_PUNCT_TABLE)
+    else:
+        text = _PUNCT_RE.sub('', text.lower())
+    # Punctuation is already stripped, so a whitespace split is all the tokenizing needed
+    tokens = text.split()
+
+    # STOP_WORDS might be an empty set if NLTK failed, which is fine
+    stop_words = STOP_WORDS
+    if is_ascii:
+        filtered_tokens = tuple(
+            word for word in tokens
+            if word not in stop_words and (len(word) > 1 or word[0] in _DIGITS)
+        )
+    else:
+        # Unicode digits such as '٣' or '²' are not in _DIGITS, so keep isdigit here
+        filtered_tokens = tuple(
+            word for word in tokens
+            if word not in stop_words and (len(word) > 1 or word.isdigit())
+        )
+    return filtered_tokens
 
-def extract_text_from_docx(file):
-    doc = docx.Document(file)
-    return "\n".join([para.text for para in doc.paragraphs])
-def calculate_match_score(resume_tokens, jd_keywords, min_freq=1, top_n=75):
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def extract_text_from_pdf(data: bytes):
+    pdf = pypdfium2.PdfDocument(data)
+    try:
+        return " ".join(page.get_textpage().get_text_range() for page in pdf)
+    finally:
+        pdf.close()
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def extract_text_from_docx(data: bytes):
+    doc = Document(io.BytesIO(data))
+    return "\n".join(para.text for para in doc.paragraphs)
+def calculate_match_score(resume_tokens, jd_keywords, top_n=75):
     """
     Calculate the match score between resume tokens and job description keywords.
+    jd_keywords should be a set (or frozenset) of keywords already filtered by get_keywords.
     Returns a tuple of (score, matched_keywords, missing_keywords).
     """
     if not resume_tokens or not jd_keywords:
         return 0.0, set(), set()
 
-    # Count frequency of each token in the resume
-    resume_counter = Counter(resume_tokens)
+    # JD keywords are already frequency-filtered by get_keywords
+    jd_keywords_filtered = set(jd_keywords)
     
-    # Filter JD keywords based on frequency
-    jd_keywords_filtered = {word for word, count in Counter(jd_keywords).items() if count >= min_freq}
+    # Unique resume tokens for membership checks
+    resume_set = set(resume_tokens)
     
     # Get matched keywords
-    matched_keywords = jd_keywords_filtered.intersection(resume_counter.keys())
+    matched_keywords = jd_keywords_filtered & resume_set
     
     # Get missing keywords
     missing_keywords = jd_keywords_filtered.difference(matched_keywords)
@@ -147,22 +154,43 @@ def calculate_match_score(resume_tokens, jd_keywords, min_freq=1, top_n=75):
     
     # Limit to top N keywords if specified
     if top_n > 0:
-        matched_keywords = set(sorted(matched_keywords, key=lambda x: resume_counter[x], reverse=True)[:top_n])
-        missing_keywords = set(sorted(missing_keywords, key=lambda x: resume_counter[x], reverse=True)[:top_n])
+        if matched_keywords:
+            # Only count resume tokens that matched a JD keyword
+            resume_counter = Counter(token for token in resume_tokens if token in matched_keywords)
+            matched_keywords = set(heapq.nlargest(top_n, matched_keywords, key=resume_counter.__getitem__))
+        missing_keywords = set(heapq.nsmallest(top_n, missing_keywords))
     
     return round(score, 2), matched_keywords, missing_keywords
 
 def get_keywords(text, min_freq=2, top_n=50):
-    """Extracts keywords based on frequency, excluding common words."""
-    tokens = preprocess_text(text)
+    """Extracts keywords based on frequency, excluding common words. Returns a tuple."""
+    return _extract_keywords_from_tokens(preprocess_text(text), min_freq, top_n)
+
+def _extract_keywords_from_tokens(tokens, min_freq=2, top_n=50):
+    """Extracts keywords from already preprocessed tokens. Returns a tuple."""
     if not tokens:
-        return []
+        return ()
     
     counts = Counter(tokens)
-    keywords = [word for word, count in counts.most_common(top_n * 2)
-                if count >= min_freq and not word.isdigit()]
-    return keywords[:top_n]
-# --- Streamlit App UI (ensure it starts after NLTK check) ---
+    # Drop the long tail of rare words before selecting the top N
+    eligible = {word: count for word, count in counts.items()
+                if count >= min_freq and not word.isdigit()}
+    return tuple(heapq.nlargest(top_n, eligible, key=eligible.__getitem__))
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def analyze(jd_text: str, resume_text: str):
+    """
+    Runs the full keyword analysis for a JD/resume pair, cached on the text contents.
+    Returns a tuple of (score, matched, missing, jd_keywords_extracted, resume_tokens_processed).
+    """
+    jd_tokens = preprocess_text(jd_text)
+    resume_tokens_processed = preprocess_text(resume_text)
+    jd_keywords_extracted = _extract_keywords_from_tokens(jd_tokens, min_freq=1, top_n=75)
+
+    score, matched, missing = calculate_match_score(resume_tokens_processed, frozenset(jd_keywords_extracted))
+    return score, matched, missing, jd_keywords_extracted, resume_tokens_processed
+
+# --- Streamlit App UI (NLTK is loaded lazily on the first Analyze click) ---
 st.set_page_config(page_title="ATS Resume Checker",page_icon="nand.png", layout="wide")
 st.title("📄 ATS Resume Checker")
 st.markdown("""
@@ -170,12 +198,6 @@ st.markdown("""
     This tool provides a basic keyword-based matching.
 """)
 
-if not NLTK_RESOURCES_READY:
-    st.error("NLTK resources failed to load. The application may not work correctly. Check the console output for details.")
-    # Optionally st.stop() if the app is completely broken without NLTK
-    # st.stop()
-
-
 # The rest of your Streamlit UI code (col1, col2, button, etc.)
 # ... (paste the UI part of your previous code here)
 # --- Input Columns ---
@@ -201,7 +223,11 @@ with col2:
 
 # --- Analysis Button ---
 if st.button("🔍 Analyze Resume", type="primary", use_container_width=True):
+    # --- Initialize NLTK resources and dependent imports (cached after first run) ---
+    NLTK_RESOURCES_READY, STOP_WORDS = download_nltk_resources()
     if not NLTK_RESOURCES_READY:
+        # Don't keep a failed check cached, so a transient download error can be retried
+        download_nltk_resources.clear()
         st.error("Cannot analyze: NLTK resources are not available. Check errors in the console.")
         st.stop()
 
@@ -209,16 +235,13 @@ if st.button("🔍 Analyze Resume", type="primary", use_container_width=True):
     # ...
     resume_text = ""
     if uploaded_resume_file:
+        resume_bytes = uploaded_resume_file.getvalue()
         if uploaded_resume_file.type == "application/pdf":
-            # Ensure extract_text_from_pdf is defined and PyPDF2 imported
-            import PyPDF2 
-            resume_text = extract_text_from_pdf(uploaded_resume_file)
+            resume_text = extract_text_from_pdf(resume_bytes)
         elif uploaded_resume_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document": # DOCX
-            # Ensure extract_text_from_docx is defined and python-docx imported
-            from docx import Document
-            resume_text = extract_text_from_docx(uploaded_resume_file)
+            resume_text = extract_text_from_docx(resume_bytes)
         elif uploaded_resume_file.type == "text/plain":
-            resume_text = uploaded_resume_file.read().decode()
+            resume_text = resume_bytes.decode()
         else:
             st.error("Unsupported file type for resume.")
             st.stop()
@@ -240,9 +263,8 @@ if st.button("🔍 Analyze Resume", type="primary", use_container_width=True):
     # (Your existing analysis logic: get_keywords, calculate_match_score)
     # ...
     with st.spinner("Analyzing... This might take a moment."):
-        # Ensure get_keywords and calculate_match_score are defined
-        jd_keywords_extracted = get_keywords(jd_text, min_freq=1, top_n=75) # get_keywords calls preprocess_text
-        resume_tokens_processed = preprocess_text(resume_text) 
+        # Cached on the JD/resume text, so repeated analyses of the same pair are free
+        score, matched, missing, jd_keywords_extracted, resume_tokens_processed = analyze(jd_text, resume_text)
 
         if not jd_keywords_extracted:
             st.error("Could not extract any meaningful keywords from the Job Description. Please check its content.")
@@ -251,9 +273,6 @@ if st.button("🔍 Analyze Resume", type="primary", use_container_width=True):
             st.error("Could not extract any meaningful tokens from the Resume. Please check its content or NLTK setup (see console).")
             st.stop()
 
-        score, matched, missing = calculate_match_score(resume_tokens_processed, jd_keywords_extracted)
-
-
     # (Your existing results display logic: st.metric, columns for matched/missing, tips)
     # ...
     st.subheader("📊 Analysis Results")
@@ -311,8 +330,7 @@ if st.button("🔍 Analyze Resume", type="primary", use_container_width=True):
         st.json(resume_tokens_processed[:200])
 
 else:
-    if NLTK_RESOURCES_READY:
-        st.info("Enter the Job Description and your Resume details, then click 'Analyze Resume'.")
+    st.info("Enter the Job Description and your Resume details, then click 'Analyze Resume'.")
 
 st.markdown("---")
 st.markdown("Built with ❤️ by Nand Gajjar")